@@ -2,47 +2,52 @@ from pathlib import Path
 
 import numpy as np
 import pandas as pd
-import statsmodels.api as sm
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-
-PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
-PROCESSED_DIR.mkdir(parents=True, exist_ok=True)
+from src.backtest.metrics import drawdown
+from src.features.ols import fit_ols
+from src.io import read_table, table_suffix, write_table
+from src.paths import PROCESSED_DIR, ensure_dirs
 
 TRADING_DAYS_PER_YEAR = 252
 TURNOVER_COST = 0.0002
 
 def _estimate_beta(y: pd.Series, x: pd.Series) -> float:
-    df = pd.concat({"y": y, "x": x}, axis=1).dropna()
-    X = sm.add_constant(df["x"])
-    model = sm.OLS(df["y"], X).fit()
-    return float(model.params["x"])
+    _, beta, _, _ = fit_ols(y, x)
+    return beta
 
 
 def _compute_portfolio_returns(df: pd.DataFrame, y_col: str, x_col: str, beta: float,) -> pd.Series:
-    y = df[y_col]
-    x = df[x_col]
-    pos = df["position"]
-
-    y_ret = y.pct_change()
-    x_ret = x.pct_change()
-
-    pos_lag = pos.shift(1).fillna(0)
+    y = df[y_col].to_numpy(dtype=np.float32)
+    x = df[x_col].to_numpy(dtype=np.float32)
+    pos = df["position"].to_numpy(dtype=np.float32)
+    beta = np.float32(beta)
+
+    y_ret = np.empty_like(y)
+    y_ret[0] = np.nan
+    y_ret[1:] = y[1:] / y[:-1] - 1
+    x_ret = np.empty_like(x)
+    x_ret[0] = np.nan
+    x_ret[1:] = x[1:] / x[:-1] - 1
+
+    pos_lag = np.empty_like(pos)
+    pos_lag[0] = 0
+    pos_lag[1:] = pos[:-1]
 
     spread_ret = y_ret - beta * x_ret
 
-    turnover = pos_lag.diff().abs().fillna(0)
+    turnover = np.empty_like(pos)
+    turnover[0] = 0
+    turnover[1:] = np.abs(np.diff(pos_lag))
 
     cost = TURNOVER_COST * turnover
 
     strat_ret = pos_lag * spread_ret - cost
-    strat_ret.name = "strategy_return"
-    return strat_ret
+    return pd.Series(strat_ret, index=df.index, name="strategy_return")
 
 
 
 
-def _compute_performance_stats(ret: pd.Series) -> dict:
+def compute_performance_stats(ret: pd.Series) -> dict:
     ret = ret.dropna()
     if ret.empty:
         return {
@@ -54,8 +59,8 @@ def _compute_performance_stats(ret: pd.Series) -> dict:
             "num_days": 0,
         }
 
-    cum_ret = (1 + ret).cumprod()
-    total_return = float(cum_ret.iloc[-1] - 1.0)
+    cum_ret = np.cumprod(1.0 + ret.to_numpy())
+    total_return = float(cum_ret[-1] - 1.0)
 
     avg_daily_ret = float(ret.mean())
     daily_vol = float(ret.std(ddof=1))
@@ -68,9 +73,7 @@ def _compute_performance_stats(ret: pd.Series) -> dict:
     annual_vol = daily_vol * np.sqrt(TRADING_DAYS_PER_YEAR) if daily_vol > 0 else 0.0
     sharpe = annual_return / annual_vol if annual_vol > 0 else 0.0
 
-    running_max = cum_ret.cummax()
-    drawdown = (cum_ret - running_max) / running_max
-    max_drawdown = float(drawdown.min())
+    max_drawdown = float(drawdown(cum_ret).min())
 
     return {
         "total_return": total_return,
@@ -82,28 +85,32 @@ def _compute_performance_stats(ret: pd.Series) -> dict:
     }
 
 
-def main(pair: str | None = None) -> Path:
+def main(pair: str | None = None, csv: bool = False) -> Path:
     import argparse
 
     parser = argparse.ArgumentParser(description="Backtest pairs trading strategy")
     parser.add_argument("--pair", type=str, help="Pair like KO_PEP or XOM_CVX")
+    parser.add_argument("--csv", action="store_true", help="Read/write CSV instead of Parquet")
     args = parser.parse_args()
 
     if args.pair:
         pair = args.pair
+    if args.csv:
+        csv = True
     if not pair:
         raise ValueError("Must provide --pair like: KO_PEP")
 
     y_ticker, x_ticker = pair.split("_")
 
-    in_path = PROCESSED_DIR / f"signals_{pair}.csv"
+    suffix = table_suffix(csv)
+    in_path = PROCESSED_DIR / f"signals_{pair}{suffix}"
     if not in_path.exists():
         raise FileNotFoundError(
             f"Signals file not found: {in_path}. "
             "Run: python -m src.features.hedge_ratio and src.features.signals first."
         )
 
-    df = pd.read_csv(in_path, parse_dates=["date"]).set_index("date")
+    df = read_table(in_path)
 
     for col in [y_ticker, x_ticker, "position"]:
         if col not in df.columns:
@@ -117,10 +124,11 @@ def main(pair: str | None = None) -> Path:
     df["strategy_return"] = ret
     df["equity_curve"] = (1 + ret.fillna(0)).cumprod()
 
-    stats = _compute_performance_stats(ret)
+    stats = compute_performance_stats(ret)
 
-    out_path = PROCESSED_DIR / f"backtest_results_{pair}.csv"
-    df.to_csv(out_path)
+    ensure_dirs(PROCESSED_DIR)
+    out_path = PROCESSED_DIR / f"backtest_results_{pair}{suffix}"
+    write_table(df, out_path)
 
     print("[backtest] ===== Performance summary =====")
     print(f"[backtest] Days: {stats['num_days']}")
@@ -0,0 +1,102 @@
+import argparse
+import itertools
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import yaml
+from numba import njit, prange
+
+from src.backtest.backtest import compute_performance_stats
+from src.features.hedge_ratio import load_hedge
+from src.features.rolling import rolling_zscore
+from src.io import table_suffix, write_table
+from src.live.paper_engine import ENTRY_Z, EXIT_Z, TRANSACTION_COST, simulate
+from src.paths import CONFIG_DIR, PROCESSED_DIR, ensure_dirs
+
+
+@njit(parallel=True, cache=True)
+def simulate_all(Y, X, Z, beta, entry, exit_, risk_frac, cost, cash0):
+    K, N = Y.shape
+    equity = np.empty((K, N))
+    fees = np.empty(K)
+    for k in prange(K):
+        _, _, _, eq, fee = simulate(
+            Y[k], X[k], Z[k], beta[k], entry[k], exit_[k], risk_frac, cost, cash0,
+        )
+        equity[k] = eq
+        fees[k] = fee.sum()
+    return equity, fees
+
+
+def main(pairs: list[str] | None = None, csv: bool = False) -> Path:
+    parser = argparse.ArgumentParser(description="Grid-search paper trading parameters across pairs")
+    parser.add_argument("--pairs", nargs="+", help="Pairs like MA_V KO_PEP (default: tested_pairs in config/backtest.yaml)")
+    parser.add_argument("--windows", nargs="+", type=int, default=[60, 90], help="Rolling z-score windows")
+    parser.add_argument("--entry-z", nargs="+", type=float, default=[ENTRY_Z])
+    parser.add_argument("--exit-z", nargs="+", type=float, default=[EXIT_Z])
+    parser.add_argument("--cash", type=float, default=100_000.0, help="Starting cash")
+    parser.add_argument("--risk-frac", type=float, default=0.5, help="Fraction of equity to deploy per spread (0-1)")
+    parser.add_argument("--csv", action="store_true", help="Read/write CSV instead of Parquet")
+    args = parser.parse_args()
+
+    if args.pairs:
+        pairs = args.pairs
+    if not pairs:
+        cfg = yaml.safe_load(open(CONFIG_DIR / "backtest.yaml", "r", encoding="utf-8"))
+        pairs = cfg["tested_pairs"]
+    if args.csv:
+        csv = True
+    suffix = table_suffix(csv)
+
+    loaded = {}
+    for pair in pairs:
+        y_ticker, x_ticker = pair.split("_")
+        df, meta = load_hedge(pair, csv)
+        loaded[pair] = (df[[y_ticker, x_ticker, "spread"]], float(meta["beta"]))
+    index = None
+    for df, _ in loaded.values():
+        index = df.index if index is None else index.intersection(df.index)
+
+    rows = []
+    Y, X, Z, betas = [], [], [], []
+    for pair, (df, beta) in loaded.items():
+        y_ticker, x_ticker = pair.split("_")
+        df = df.loc[index]
+        spread = df["spread"].to_numpy(dtype=float)
+        for window in args.windows:
+            z = rolling_zscore(spread, window)
+            for entry_z, exit_z in itertools.product(args.entry_z, args.exit_z):
+                rows.append({"pair": pair, "window": window, "entry_z": entry_z, "exit_z": exit_z})
+                Y.append(df[y_ticker].to_numpy(dtype=float))
+                X.append(df[x_ticker].to_numpy(dtype=float))
+                Z.append(z)
+                betas.append(beta)
+
+    entry = np.array([r["entry_z"] for r in rows])
+    exit_ = np.array([r["exit_z"] for r in rows])
+    equity, fees = simulate_all(
+        np.vstack(Y), np.vstack(X), np.vstack(Z), np.array(betas),
+        entry, exit_, args.risk_frac, TRANSACTION_COST, args.cash,
+    )
+
+    for k, row in enumerate(rows):
+        ret = pd.Series(equity[k]).pct_change()
+        row.update(compute_performance_stats(ret))
+        row["fees"] = float(fees[k])
+
+    results = pd.DataFrame(rows).sort_values("sharpe", ascending=False).reset_index(drop=True)
+
+    ensure_dirs(PROCESSED_DIR)
+    out_path = PROCESSED_DIR / f"grid_results{suffix}"
+    write_table(results, out_path)
+
+    print(f"[grid] ===== {len(rows)} runs over {len(pairs)} pairs =====")
+    print(results.head(10).to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    print(f"[grid] saved {out_path}")
+
+    return out_path
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+import numpy as np
+
+
+def drawdown(equity) -> np.ndarray:
+    equity = np.asarray(equity, dtype=float)
+    peak = np.maximum.accumulate(equity)
+    return equity / peak - 1.0
@@ -1,25 +1,53 @@
 
 from pathlib import Path
+import argparse
 import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-RAW_PATH = PROJECT_ROOT / "data" / "raw" / "adj_close.csv"
-OUT_DIR = PROJECT_ROOT / "data" / "interim"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-OUT_PATH = OUT_DIR / "adj_close_clean.csv"
+from src.io import table_suffix, write_table
+from src.paths import INTERIM_DIR, RAW_DIR, ensure_dirs
 
-def clean_data():
+RAW_PATH = RAW_DIR / "adj_close.csv"
+
+
+def _read_raw() -> pd.DataFrame:
+    header = pd.read_csv(RAW_PATH, nrows=0).columns
+    column_types = {c: pa.float32() for c in header if c != "date"}
+    column_types["date"] = pa.timestamp("ns")
+    try:
+        table = pacsv.read_csv(
+            RAW_PATH,
+            convert_options=pacsv.ConvertOptions(
+                timestamp_parsers=["%Y-%m-%d", pacsv.ISO8601],
+                column_types=column_types,
+            ),
+        )
+    except pa.ArrowInvalid as e:
+        # Stray tokens or odd date formats: coerce like the pandas reader did.
+        print(f"[clean] Strict parse failed ({e}); coercing bad values to NaN")
+        df = pd.read_csv(RAW_PATH)
+        df["date"] = pd.to_datetime(df["date"], errors="coerce")
+        df = df.dropna(subset=["date"])
+        for col in df.columns.drop("date"):
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float32")
+        return df
+
+    df = table.to_pandas(date_as_object=False, self_destruct=True)
+    del table
+    return df
+
+
+def clean_data(csv: bool = False) -> Path:
+    out_path = INTERIM_DIR / f"adj_close_clean{table_suffix(csv, mmap=True)}"
     print(f"[clean] Reading {RAW_PATH}")
-    df = pd.read_csv(RAW_PATH, parse_dates=["date"])
+    df = _read_raw()
     df = df.sort_values("date").drop_duplicates(subset=["date"])
     df.set_index("date", inplace=True)
 
-    for col in df.columns:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-
     before = len(df)
-    df = df.dropna()
-    df = df[(df > 0).all(axis=1)]
+    mask = df.notna().all(axis=1) & (df > 0).all(axis=1)
+    df = df[mask]
     after = len(df)
 
     print(f"[clean] Dropped {before - after} bad rows (NaN or <=0)")
@@ -30,9 +58,15 @@ def clean_data():
     print(f"[clean] Date range: {df.index.min().date()} -> {df.index.max().date()}")
     print(f"[clean] Example correlations:\n{corr_matrix.iloc[:4, :4].round(3)}")
 
-    df.to_csv(OUT_PATH)
-    print(f"[clean] Saved cleaned data to {OUT_PATH}")
+    ensure_dirs(INTERIM_DIR)
+    write_table(df, out_path)
+    print(f"[clean] Saved cleaned data to {out_path}")
+
+    return out_path
 
 
 if __name__ == "__main__":
-    clean_data()
+    parser = argparse.ArgumentParser(description="Clean raw adjusted close prices")
+    parser.add_argument("--csv", action="store_true", help="Write CSV instead of Feather")
+    args = parser.parse_args()
+    clean_data(csv=args.csv)
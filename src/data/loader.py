@@ -1,19 +1,16 @@
 
-from pathlib import Path
 import yaml
 import pandas as pd
 
+from src.paths import CONFIG_DIR, RAW_DIR, ensure_dirs
 
-import yfinance as yf
 
-
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-CONFIG_PATH = PROJECT_ROOT / "config" / "data.yaml"
-RAW_DIR = PROJECT_ROOT / "data" / "raw"
-RAW_DIR.mkdir(parents=True, exist_ok=True)
+CONFIG_PATH = CONFIG_DIR / "data.yaml"
 
 
 def load_prices():
+    import yfinance as yf
+
     cfg = yaml.safe_load(open(CONFIG_PATH, "r", encoding="utf-8"))
     tickers = [t.strip().upper() for t in cfg["tickers"]]
     start = cfg["start_date"]
@@ -44,6 +41,7 @@ def load_prices():
     adj = adj[tickers] 
     adj = adj.sort_index()
 
+    ensure_dirs(RAW_DIR)
     out_path = RAW_DIR / "adj_close.csv"
     adj.to_csv(out_path, index=True)
 
@@ -1,58 +1,27 @@
-
-
 from pathlib import Path
 import pandas as pd
 import numpy as np
-import statsmodels.api as sm
 import argparse
+import json
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-CLEAN_PATH = PROJECT_ROOT / "data" / "interim" / "adj_close_clean.csv"
-OUT_DIR = PROJECT_ROOT / "data" / "processed"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-OUT_PATH = OUT_DIR / "hedge_results.csv"
+from src.features.ols import fit_ols
+from src.io import read_table, table_suffix, write_table
+from src.paths import INTERIM_DIR, PROCESSED_DIR, ensure_dirs
 
 ROLLING_Z_WINDOW = 60 
 
 
-def _fit_ols(y: pd.Series, x: pd.Series):
-
-    df = pd.concat({"y": y, "x": x}, axis=1).dropna()
-    X = sm.add_constant(df["x"]) 
-    model = sm.OLS(df["y"], X)
-    res = model.fit()
-
-    alpha = float(res.params["const"])
-    beta = float(res.params["x"])
-    r2 = float(res.rsquared)
-    resid = df["y"] - (alpha + beta * df["x"])
-    return alpha, beta, r2, resid
-
-
-def main(y_ticker: str | None = None, x_ticker: str | None = None) -> Path:
-    parser = argparse.ArgumentParser(description="Compute hedge ratio for a pair")
-    parser.add_argument("--y", type=str, help="Ticker Y (dependent variable)")
-    parser.add_argument("--x", type=str, help="Ticker X (independent variable)")
-    args = parser.parse_args()
-
-    if args.y:
-        y_ticker = args.y.upper()
-    if args.x:
-        x_ticker = args.x.upper()
-
-    if not y_ticker or not x_ticker:
-        raise ValueError("You must provide tickers using --y and --x")
-
-    if not CLEAN_PATH.exists():
+def load_pair_prices(y_ticker: str, x_ticker: str, csv: bool = False) -> pd.DataFrame:
+    clean_path = INTERIM_DIR / f"adj_close_clean{table_suffix(csv, mmap=True)}"
+    if not clean_path.exists():
         raise FileNotFoundError(
-            f"Clean file not found: {CLEAN_PATH}. Run: python -m src.data.clean first."
+            f"Clean file not found: {clean_path}. Run: python -m src.data.clean first."
         )
+    return read_table(clean_path, columns=[y_ticker, x_ticker]).dropna()
 
-    df = pd.read_csv(CLEAN_PATH, parse_dates=["date"]).set_index("date")
-
-    df = df[[y_ticker, x_ticker]].dropna()
 
-    alpha, beta, r2, resid = _fit_ols(df[y_ticker], df[x_ticker])
+def compute_hedge(df: pd.DataFrame, y_ticker: str, x_ticker: str) -> tuple[pd.DataFrame, dict]:
+    alpha, beta, r2, resid = fit_ols(df[y_ticker], df[x_ticker])
     spread = df[y_ticker] - beta * df[x_ticker]
     spread.name = "spread"
 
@@ -66,15 +35,67 @@ def main(y_ticker: str | None = None, x_ticker: str | None = None) -> Path:
     z_full.name = "zscore_full"
 
     out = pd.concat([df, spread, z_full], axis=1)
+    meta = {"alpha": alpha, "beta": beta, "r2": r2, "mu": mu, "sigma": sigma}
+    return out, meta
+
+
+def write_hedge(out: pd.DataFrame, meta: dict, pair: str, csv: bool = False) -> tuple[Path, Path]:
+    ensure_dirs(PROCESSED_DIR)
+    out_path = PROCESSED_DIR / f"hedge_results_{pair}{table_suffix(csv)}"
+    write_table(out, out_path)
+
+    meta_path = PROCESSED_DIR / f"hedge_meta_{pair}.json"
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+
+    return out_path, meta_path
+
+
+def load_hedge(pair: str, csv: bool = False) -> tuple[pd.DataFrame, dict]:
+    hedge_path = PROCESSED_DIR / f"hedge_results_{pair}{table_suffix(csv)}"
+    meta_path = PROCESSED_DIR / f"hedge_meta_{pair}.json"
+    for path in (hedge_path, meta_path):
+        if not path.exists():
+            raise FileNotFoundError(
+                f"{path} not found. Run hedge_ratio for this pair first!"
+            )
+
+    with open(meta_path, "r", encoding="utf-8") as f:
+        meta = json.load(f)
+    return read_table(hedge_path), meta
+
+
+def print_hedge_summary(pair: str, meta: dict) -> None:
+    print(f"[hedge] ===== OLS results ({pair}) =====")
+    print(f"[hedge] beta: {meta['beta']:.4f}, alpha: {meta['alpha']:.4f}, R2: {meta['r2']:.3f}")
+    print(f"[hedge] mean={meta['mu']:.4f}, std={meta['sigma']:.4f}")
+
+
+def main(y_ticker: str | None = None, x_ticker: str | None = None, csv: bool = False) -> Path:
+    parser = argparse.ArgumentParser(description="Compute hedge ratio for a pair")
+    parser.add_argument("--y", type=str, help="Ticker Y (dependent variable)")
+    parser.add_argument("--x", type=str, help="Ticker X (independent variable)")
+    parser.add_argument("--csv", action="store_true", help="Read/write CSV instead of Feather/Parquet")
+    args = parser.parse_args()
+
+    if args.y:
+        y_ticker = args.y.upper()
+    if args.x:
+        x_ticker = args.x.upper()
+    if args.csv:
+        csv = True
+
+    if not y_ticker or not x_ticker:
+        raise ValueError("You must provide tickers using --y and --x")
 
     PAIR = f"{y_ticker}_{x_ticker}"
-    out_path = OUT_DIR / f"hedge_results_{PAIR}.csv"
-    out.to_csv(out_path)
+    df = load_pair_prices(y_ticker, x_ticker, csv)
+    out, meta = compute_hedge(df, y_ticker, x_ticker)
+    out_path, meta_path = write_hedge(out, meta, PAIR, csv)
 
-    print(f"[hedge] ===== OLS results ({PAIR}) =====")
-    print(f"[hedge] beta: {beta:.4f}, alpha: {alpha:.4f}, R2: {r2:.3f}")
-    print(f"[hedge] mean={mu:.4f}, std={sigma:.4f}")
+    print_hedge_summary(PAIR, meta)
     print(f"[hedge] saved → {out_path}  (rows={out.shape[0]})")
+    print(f"[hedge] saved → {meta_path}")
 
     return out_path
 
@@ -0,0 +1,24 @@
+import numpy as np
+
+
+def fit_ols(y, x):
+    y = np.asarray(y, dtype=np.float64)
+    x = np.asarray(x, dtype=np.float64)
+    mask = np.isfinite(y) & np.isfinite(x)
+    if not mask.all():
+        y = y[mask]
+        x = x[mask]
+
+    x_mean = x.mean()
+    y_mean = y.mean()
+    dx = x - x_mean
+    dy = y - y_mean
+
+    beta = float((dx * dy).sum() / (dx * dx).sum())
+    alpha = float(y_mean - beta * x_mean)
+
+    resid = y - (alpha + beta * x)
+    ss_res = (resid ** 2).sum()
+    ss_tot = (dy ** 2).sum()
+    r2 = float(1.0 - ss_res / ss_tot)
+    return alpha, beta, r2, resid
@@ -0,0 +1,50 @@
+import numpy as np
+from numba import njit
+
+
+@njit(cache=True)
+def rolling_zscore(x, window):
+    n = x.shape[0]
+    out = np.full(n, np.nan)
+    if window < 2:
+        return out
+
+    # Welford add/remove updates avoid the s2 - s*s/w cancellation of running sums.
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        v = x[i]
+        if not np.isnan(v):
+            count += 1
+            delta = v - mean
+            mean += delta / count
+            m2 += delta * (v - mean)
+        if i >= window:
+            old = x[i - window]
+            if not np.isnan(old):
+                count -= 1
+                if count == 0:
+                    mean = 0.0
+                    m2 = 0.0
+                else:
+                    delta = old - mean
+                    mean -= delta / count
+                    m2 -= delta * (old - mean)
+        if i >= window - 1 and (i + 1) % window == 0:
+            # Re-anchor once per window so rounding drift cannot build up.
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+            for j in range(i - window + 1, i + 1):
+                if not np.isnan(x[j]):
+                    count += 1
+                    delta = x[j] - mean
+                    mean += delta / count
+                    m2 += delta * (x[j] - mean)
+        if i >= window - 1 and count == window:
+            var = m2 / (window - 1)
+            if var > 0:
+                out[i] = (v - mean) / np.sqrt(var)
+
+    return out
@@ -1,14 +1,10 @@
 from pathlib import Path
+import numpy as np
 import pandas as pd
 import argparse
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-
-IN_PATH = PROJECT_ROOT / "data" / "processed" / "hedge_results.csv"
-
-OUT_DIR = PROJECT_ROOT / "data" / "processed"
-OUT_DIR.mkdir(parents=True, exist_ok=True)
-OUT_PATH = OUT_DIR / "signals.csv"
+from src.io import read_table, table_suffix, write_table
+from src.paths import PROCESSED_DIR, ensure_dirs
 
 
 ENTRY_Z = 2.0     
@@ -21,20 +17,16 @@ def _choose_z_column(df: pd.DataFrame) -> str:
         return roll_cols[0]
     if "zscore_full" in df.columns:
         return "zscore_full"
-    raise KeyError("No z-score column found in hedge_results.csv")
+    raise KeyError("No z-score column found in hedge results")
 
 
 def _compute_signals(z: pd.Series) -> pd.DataFrame:
-    signal = pd.Series(0, index=z.index, name="signal")
+    signal = pd.Series(0, index=z.index, name="signal", dtype=np.int8)
 
     signal[z > ENTRY_Z] = -1    
     signal[z < -ENTRY_Z] = 1   
 
-    position = signal.copy().rename("position")
-
-    for i in range(1, len(position)):
-        if position.iat[i] == 0:
-            position.iat[i] = position.iat[i - 1]
+    position = signal.where(signal != 0).ffill().fillna(0).astype(np.int8).rename("position")
 
     flat_mask = z.abs() < EXIT_Z
     position[flat_mask] = 0
@@ -42,39 +34,51 @@ def _compute_signals(z: pd.Series) -> pd.DataFrame:
     return pd.concat([signal, position], axis=1)
 
 
-def main(pair: str | None = None) -> Path:
+def add_signals(df: pd.DataFrame) -> str:
+    z_col = _choose_z_column(df)
+    sig_df = _compute_signals(df[z_col])
+
+    df["signal"] = sig_df["signal"]
+    df["position"] = sig_df["position"]
+    return z_col
+
+
+def write_signals(df: pd.DataFrame, pair: str, csv: bool = False) -> Path:
+    ensure_dirs(PROCESSED_DIR)
+    out_path = PROCESSED_DIR / f"signals_{pair}{table_suffix(csv)}"
+    write_table(df, out_path)
+    return out_path
+
+
+def print_signals_summary(pair: str, z_col: str) -> None:
+    print("[signals] ===== Signal generation =====")
+    print(f"[signals] pair: {pair}")
+    print(f"[signals] using z column: {z_col}")
+    print(f"[signals] entry_z={ENTRY_Z}, exit_z={EXIT_Z}")
+
+
+def main(pair: str | None = None, csv: bool = False) -> Path:
     parser = argparse.ArgumentParser(description="Generate trading signals for a pair")
     parser.add_argument("--pair", type=str, help="Pair like KO_PEP")
+    parser.add_argument("--csv", action="store_true", help="Read/write CSV instead of Parquet")
     args = parser.parse_args()
 
     if args.pair:
         pair = args.pair
+    if args.csv:
+        csv = True
     if not pair:
         raise ValueError("Must provide --pair like: KO_PEP")
 
-    y_ticker, x_ticker = pair.split("_")
-
-    in_path = OUT_DIR / f"hedge_results_{pair}.csv"
+    in_path = PROCESSED_DIR / f"hedge_results_{pair}{table_suffix(csv)}"
     if not in_path.exists():
         raise FileNotFoundError(f"Input {in_path} not found. Run hedge_ratio first!")
 
-    df = pd.read_csv(in_path, parse_dates=["date"]).set_index("date")
+    df = read_table(in_path)
+    z_col = add_signals(df)
+    out_path = write_signals(df, pair, csv)
 
-    z_col = _choose_z_column(df)
-    z = df[z_col]
-
-    sig_df = _compute_signals(z)
-
-    df["signal"] = sig_df["signal"]
-    df["position"] = sig_df["position"]
-
-    out_path = OUT_DIR / f"signals_{pair}.csv"
-    df.to_csv(out_path)
-
-    print("[signals] ===== Signal generation =====")
-    print(f"[signals] pair: {pair}")
-    print(f"[signals] using z column: {z_col}")
-    print(f"[signals] entry_z={ENTRY_Z}, exit_z={EXIT_Z}")
+    print_signals_summary(pair, z_col)
     print(f"[signals] saved {out_path} (rows={df.shape[0]})")
 
     return out_path
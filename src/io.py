@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pacsv
+from pyarrow import feather
+
+
+def table_suffix(csv: bool = False, mmap: bool = False) -> str:
+    if csv:
+        return ".csv"
+    return ".feather" if mmap else ".parquet"
+
+
+def read_table(path: Path, columns: list[str] | None = None) -> pd.DataFrame:
+    if path.suffix == ".feather":
+        cols = ["date", *columns] if columns is not None else None
+        table = feather.read_table(path, columns=cols, memory_map=True)
+        return table.to_pandas().set_index("date")
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    table = pacsv.read_csv(
+        path,
+        convert_options=pacsv.ConvertOptions(
+            include_columns=["date", *columns] if columns is not None else None,
+            column_types={"date": pa.timestamp("ns")},
+        ),
+    )
+    return table.to_pandas(date_as_object=False, self_destruct=True).set_index("date")
+
+
+def write_table(df: pd.DataFrame, path: Path) -> None:
+    if path.suffix == ".feather":
+        df.reset_index().to_feather(path, compression="uncompressed")
+    elif path.suffix == ".parquet":
+        df.to_parquet(path, compression="snappy")
+    else:
+        df.to_csv(path)
@@ -1,41 +1,63 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from pathlib import Path
-from typing import Dict, List
+from typing import Dict
 
 import argparse
 import pandas as pd
 import numpy as np
-import math
-import statsmodels.api as sm
+import yaml
+from numba import njit
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-INTERIM_PATH = PROJECT_ROOT / "data" / "interim" / "adj_close_clean.csv"
-PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+from src.backtest.metrics import drawdown
+from src.features.hedge_ratio import load_hedge
+from src.features.rolling import rolling_zscore
+from src.io import table_suffix, write_table
+from src.paths import CONFIG_DIR, PROCESSED_DIR, ensure_dirs
 
 ENTRY_Z = 2.0
 EXIT_Z = 0.5
 TRADING_DAYS_PER_YEAR = 252
 TRANSACTION_COST = 0.0002 
-
-@dataclass
-class Trade:
-    date: pd.Timestamp
-    leg: str       
-    ticker: str
-    qty: float
-    price: float
-    notional: float
-
+MODEL_CONFIG_PATH = CONFIG_DIR / "model.yaml"
 
 class PaperBroker:
-    def __init__(self, starting_cash: float = 100_000.0) -> None:
+    def __init__(
+        self,
+        starting_cash: float = 100_000.0,
+        y_ticker: str | None = None,
+        x_ticker: str | None = None,
+        capacity: int = 256,
+        record: bool = True,
+    ) -> None:
         self.cash: float = starting_cash
+        self.y_ticker = y_ticker
+        self.x_ticker = x_ticker
         self.positions: Dict[str, float] = {}   # ticker -> shares
-        self.trades: List[Trade] = []
         self.fees_paid: float = 0.0 
 
+        # Trade log kept as parallel columns, filled up to self._n.
+        # Columns are only allocated on the first recorded fill.
+        self.record = record
+        self._capacity = max(int(capacity), 1)
+        self._n = 0
+        self._qty = None
+
+    def _allocate(self, cap: int) -> None:
+        self._dates = np.empty(cap, dtype="datetime64[ns]")
+        self._legs = np.empty(cap, dtype=object)
+        self._tickers = np.empty(cap, dtype=object)
+        self._qty = np.empty(cap)
+        self._price = np.empty(cap)
+        self._notional = np.empty(cap)
+
+    def _grow(self) -> None:
+        cap = 2 * len(self._qty)
+        for name in ("_dates", "_legs", "_tickers", "_qty", "_price", "_notional"):
+            old = getattr(self, name)
+            new = np.empty(cap, dtype=old.dtype)
+            new[: self._n] = old[: self._n]
+            setattr(self, name, new)
+
     def ensure_ticker(self, ticker: str) -> None:
         if ticker not in self.positions:
             self.positions[ticker] = 0.0
@@ -51,17 +73,40 @@ class PaperBroker:
         self.cash -= cost
         self.fees_paid += cost
 
-        self.trades.append(
-            Trade(
-                date=date,
-                leg=leg,
-                ticker=ticker,
-                qty=qty,
-                price=price,
-                notional=notional,
-            )
-        )
-
+        if not self.record:
+            return
+        if self._qty is None:
+            self._allocate(self._capacity)
+        elif self._n == len(self._qty):
+            self._grow()
+        i = self._n
+        self._dates[i] = np.datetime64(date, "ns")
+        self._legs[i] = leg
+        self._tickers[i] = ticker
+        self._qty[i] = qty
+        self._price[i] = price
+        self._notional[i] = notional
+        self._n += 1
+
+    def trades_df(self) -> pd.DataFrame:
+        if self._qty is None:
+            return pd.DataFrame({
+                "date": np.empty(0, dtype="datetime64[ns]"),
+                "leg": np.empty(0, dtype=object),
+                "ticker": np.empty(0, dtype=object),
+                "qty": np.empty(0),
+                "price": np.empty(0),
+                "notional": np.empty(0),
+            })
+        n = self._n
+        return pd.DataFrame({
+            "date": self._dates[:n],
+            "leg": self._legs[:n],
+            "ticker": self._tickers[:n],
+            "qty": self._qty[:n],
+            "price": self._price[:n],
+            "notional": self._notional[:n],
+        })
 
     def position(self, ticker: str) -> float:
         return self.positions.get(ticker, 0.0)
@@ -73,6 +118,70 @@ class PaperBroker:
                 eq += qty * prices[ticker]
         return eq
 
+    def mark(self, price_y: float, price_x: float) -> float:
+        pos_y = self.positions.get(self.y_ticker, 0.0)
+        pos_x = self.positions.get(self.x_ticker, 0.0)
+        return self.cash + pos_y * price_y + pos_x * price_x
+
+
+@njit(cache=True)
+def simulate(py, px, zv, beta, entry, exit_, risk_frac, cost, cash0):
+    n = py.shape[0]
+    signals = np.empty(n, dtype=np.int8)
+    positions_y = np.empty(n)
+    positions_x = np.empty(n)
+    equity = np.empty(n)
+    fees = np.zeros(n)
+
+    # Price-only sizing terms do not depend on equity, so compute them once.
+    denom = py + abs(beta) * px
+    z_scale = np.minimum(2.0, np.abs(zv) / max(entry, 1e-6))
+
+    pos_y = 0.0
+    pos_x = 0.0
+    cash = cash0
+    current_pos = 0
+
+    for i in range(n):
+        z_i = zv[i]
+
+        target_pos = current_pos
+        if z_i > entry:
+            target_pos = -1
+        elif z_i < -entry:
+            target_pos = 1
+        elif abs(z_i) < exit_:
+            target_pos = 0
+
+        if target_pos != current_pos:
+            equity_now = cash + pos_y * py[i] + pos_x * px[i]
+            unit = risk_frac * equity_now * z_scale[i] / denom[i]
+
+            trade_y = target_pos * unit - pos_y
+            trade_x = -target_pos * beta * unit - pos_x
+
+            if abs(trade_y) > 1e-6:
+                notional = trade_y * py[i]
+                fee = abs(notional) * cost
+                pos_y += trade_y
+                cash -= notional + fee
+                fees[i] += fee
+            if abs(trade_x) > 1e-6:
+                notional = trade_x * px[i]
+                fee = abs(notional) * cost
+                pos_x += trade_x
+                cash -= notional + fee
+                fees[i] += fee
+
+            current_pos = target_pos
+
+        signals[i] = current_pos
+        positions_y[i] = pos_y
+        positions_x[i] = pos_x
+        equity[i] = cash + pos_y * py[i] + pos_x * px[i]
+
+    return signals, positions_y, positions_x, equity, fees
+
 
 class PairsLiveEngine:
     def __init__(
@@ -83,6 +192,9 @@ class PairsLiveEngine:
         entry_z: float = ENTRY_Z,
         exit_z: float = EXIT_Z,
         risk_frac: float = 0.5,
+        compound_sizing: bool = True,
+        record_trades: bool = False,
+        csv: bool = False,
     ) -> None:
         self.pair = pair
         self.y_ticker, self.x_ticker = pair.split("_")
@@ -90,119 +202,55 @@ class PairsLiveEngine:
         self.entry_z = entry_z
         self.exit_z = exit_z
         self.risk_frac = risk_frac
+        self.compound_sizing = compound_sizing
+        self.record_trades = record_trades
+        self.suffix = table_suffix(csv)
 
-        self.broker = PaperBroker(starting_cash=starting_cash)
-
-        if not INTERIM_PATH.exists():
-            raise FileNotFoundError(
-                f"{INTERIM_PATH} not found. Run: python -m src.data.clean"
-            )
-        df = pd.read_csv(INTERIM_PATH, parse_dates=["date"]).set_index("date")
+        self.data, meta = load_hedge(pair, csv)
+        self.beta = float(meta["beta"])
         for t in (self.y_ticker, self.x_ticker):
-            if t not in df.columns:
-                raise KeyError(f"{t} not found in {INTERIM_PATH}")
-        self.prices_df = df[[self.y_ticker, self.x_ticker]].copy()
-
-        hedge_path = PROCESSED_DIR / f"hedge_results_{pair}.csv"
-        if not hedge_path.exists():
-            raise FileNotFoundError(
-                f"{hedge_path} not found. Run hedge_ratio for this pair first!"
-            )
-        hedge_df = pd.read_csv(hedge_path, parse_dates=["date"]).set_index("date")
-        cols_to_drop = [self.y_ticker, self.x_ticker]
-        hedge_df = hedge_df.drop(columns=cols_to_drop, errors="ignore")
-
-        self.data = self.prices_df.join(hedge_df, how="inner")
-
+            if t not in self.data.columns:
+                raise KeyError(f"{t} not found in hedge results for {pair}")
 
         if "spread" not in self.data.columns:
             raise KeyError("spread column not found in hedge results.")
 
         z_cols = [c for c in self.data.columns if c.startswith("zscore_roll")]
         self.z_col = z_cols[0] if z_cols else None
-        self.beta = float(self._infer_beta())
-
 
-    def _infer_beta(self) -> float:
-        y = self.data[self.y_ticker].astype(float)
-        x = self.data[self.x_ticker].astype(float)
-        df = pd.concat({"y": y, "x": x}, axis=1).dropna()
-
-        X = sm.add_constant(df["x"])
-        model = sm.OLS(df["y"], X).fit()
-        beta = float(model.params["x"])
-        return beta
+        # At most one fill per leg per bar; the log is only allocated when recording.
+        self.broker = PaperBroker(
+            starting_cash=starting_cash,
+            y_ticker=self.y_ticker,
+            x_ticker=self.x_ticker,
+            capacity=2 * len(self.data),
+            record=record_trades,
+        )
 
     def _compute_zscore_series(self) -> pd.Series:
         if self.z_col is not None:
             return self.data[self.z_col].copy()
 
-        spread = self.data["spread"]
-        roll_mean = spread.rolling(self.window).mean()
-        roll_std = spread.rolling(self.window).std(ddof=1)
-        z = (spread - roll_mean) / roll_std
-        z.name = f"zscore_roll_{self.window}"
-        return z
+        spread = self.data["spread"].to_numpy(dtype=float)
+        z = rolling_zscore(spread, self.window)
+        return pd.Series(z, index=self.data.index, name=f"zscore_roll_{self.window}")
 
     def run(self) -> pd.DataFrame:
         z = self._compute_zscore_series()
-        equity_curve = []
-        positions_y = []
-        positions_x = []
-        signals = []
         dates = self.data.index
+        py = self.data[self.y_ticker].to_numpy(dtype=float)
+        px = self.data[self.x_ticker].to_numpy(dtype=float)
+        zv = z.to_numpy(dtype=float)
+
+        if self.compound_sizing:
+            signals, positions_y, positions_x, equity_curve, fees = simulate(
+                py, px, zv, self.beta, self.entry_z, self.exit_z,
+                self.risk_frac, TRANSACTION_COST, self.broker.cash,
+            )
+        else:
+            signals, positions_y, positions_x, equity_curve, fees = self._run_vectorized(py, px, zv)
 
-        current_pos = 0 
-
-        for i, date in enumerate(dates):
-            row = self.data.loc[date]
-            price_y = float(row[self.y_ticker])
-            price_x = float(row[self.x_ticker])
-            z_i = float(z.loc[date])
-
-            signal = 0
-            if z_i > self.entry_z:
-                signal = -1  
-            elif z_i < -self.entry_z:
-                signal = 1  
-            elif abs(z_i) < self.exit_z:
-                signal = 0
-
-            target_pos = current_pos
-            if signal != 0:
-                target_pos = signal
-            elif abs(z_i) < self.exit_z:
-                target_pos = 0
-
-            if target_pos != current_pos:
-                equity_now = self.broker.portfolio_value({self.y_ticker: price_y, self.x_ticker: price_x})
-                base_notional = self.risk_frac * equity_now
-                z_scale = min(2.0, abs(z_i) / max(self.entry_z, 1e-6))
-
-                spread_notional = base_notional * z_scale
-
-                unit = spread_notional / (price_y + abs(self.beta) * price_x)
-
-                desired_y = target_pos * unit
-                desired_x = -target_pos * self.beta * unit
-
-                cur_y = self.broker.position(self.y_ticker)
-                cur_x = self.broker.position(self.x_ticker)
-
-                trade_y = desired_y - cur_y
-                trade_x = desired_x - cur_x
-
-                if abs(trade_y) > 1e-6:
-                    self.broker.trade(date, self.y_ticker, trade_y, price_y, leg="Y")
-                if abs(trade_x) > 1e-6:
-                    self.broker.trade(date, self.x_ticker, trade_x, price_x, leg="X")
-
-                current_pos = target_pos
-            eq = self.broker.portfolio_value({self.y_ticker: price_y, self.x_ticker: price_x})
-            equity_curve.append(eq)
-            positions_y.append(self.broker.position(self.y_ticker))
-            positions_x.append(self.broker.position(self.x_ticker))
-            signals.append(current_pos)
+        self._settle_broker(dates, py, px, positions_y, positions_x, fees)
 
         result = self.data[[self.y_ticker, self.x_ticker]].copy()
         result["zscore"] = z
@@ -215,12 +263,67 @@ class PairsLiveEngine:
         stats = self._compute_stats(result["ret"])
         self._print_summary(stats)
 
-        out_path = PROCESSED_DIR / f"paper_results_{self.pair}.csv"
-        result.to_csv(out_path)
+        ensure_dirs(PROCESSED_DIR)
+        out_path = PROCESSED_DIR / f"paper_results_{self.pair}{self.suffix}"
+        write_table(result, out_path)
         print(f"[paper] saved paper trading run to {out_path} (rows={result.shape[0]})")
 
+        if self.record_trades:
+            trades = self.broker.trades_df().set_index("date")
+            trades_path = PROCESSED_DIR / f"paper_trades_{self.pair}{self.suffix}"
+            write_table(trades, trades_path)
+            print(f"[paper] saved trade log to {trades_path} (fills={trades.shape[0]})")
+
         return result
 
+    def _run_vectorized(self, py, px, zv):
+        # Sizing off starting cash makes the whole position path known up front.
+        cash0 = self.broker.cash
+
+        event = np.where(zv > self.entry_z, -1.0, np.where(zv < -self.entry_z, 1.0, np.nan))
+        # Entries take precedence over exits, matching the bar loop in simulate.
+        event[(np.abs(zv) < self.exit_z) & np.isnan(event)] = 0.0
+        target = pd.Series(event).ffill().fillna(0.0).to_numpy()
+
+        changed = np.diff(target, prepend=0.0) != 0
+        denom = py + abs(self.beta) * px
+        z_scale = np.minimum(2.0, np.abs(zv) / max(self.entry_z, 1e-6))
+        unit = self.risk_frac * cash0 * z_scale / denom
+        unit = pd.Series(np.where(changed, unit, np.nan)).ffill().fillna(0.0).to_numpy()
+
+        trade_y = np.diff(target * unit, prepend=0.0)
+        trade_x = np.diff(-target * self.beta * unit, prepend=0.0)
+        trade_y[np.abs(trade_y) <= 1e-6] = 0.0
+        trade_x[np.abs(trade_x) <= 1e-6] = 0.0
+
+        positions_y = np.cumsum(trade_y)
+        positions_x = np.cumsum(trade_x)
+        fees = TRANSACTION_COST * (np.abs(trade_y) * py + np.abs(trade_x) * px)
+        cash = cash0 - np.cumsum(trade_y * py + trade_x * px + fees)
+        equity_curve = cash + positions_y * py + positions_x * px
+
+        return target.astype(np.int8), positions_y, positions_x, equity_curve, fees
+
+    def _settle_broker(self, dates, py, px, positions_y, positions_x, fees) -> None:
+        # Fills are only replayed through the broker when a trade log is wanted.
+        if self.record_trades:
+            trade_y = np.diff(positions_y, prepend=0.0)
+            trade_x = np.diff(positions_x, prepend=0.0)
+            for i in np.flatnonzero((trade_y != 0) | (trade_x != 0)):
+                if trade_y[i] != 0:
+                    self.broker.trade(dates[i], self.y_ticker, float(trade_y[i]), float(py[i]), leg="Y")
+                if trade_x[i] != 0:
+                    self.broker.trade(dates[i], self.x_ticker, float(trade_x[i]), float(px[i]), leg="X")
+            return
+
+        if len(dates) == 0:
+            return
+        self.broker.positions[self.y_ticker] = float(positions_y[-1])
+        self.broker.positions[self.x_ticker] = float(positions_x[-1])
+        self.broker.cash -= float(np.sum(np.diff(positions_y, prepend=0.0) * py + np.diff(positions_x, prepend=0.0) * px))
+        self.broker.cash -= float(fees.sum())
+        self.broker.fees_paid += float(fees.sum())
+
     def _compute_stats(self, ret: pd.Series) -> dict:
         ret = ret.dropna()
         if ret.empty:
@@ -233,17 +336,15 @@ class PairsLiveEngine:
                 "max_drawdown": 0.0,
             }
 
-        cum = (1 + ret).cumprod()
-        total_return = float(cum.iloc[-1] - 1.0)
+        cum = np.cumprod(1.0 + ret.to_numpy())
+        total_return = float(cum[-1] - 1.0)
         avg_daily = float(ret.mean())
         vol_daily = float(ret.std(ddof=1))
         annual_return = (1 + avg_daily) ** TRADING_DAYS_PER_YEAR - 1 if avg_daily != -1 else -1
         annual_vol = vol_daily * np.sqrt(TRADING_DAYS_PER_YEAR) if vol_daily > 0 else 0.0
         sharpe = annual_return / annual_vol if annual_vol > 0 else 0.0
 
-        running_max = cum.cummax()
-        dd = (cum - running_max) / running_max
-        max_dd = float(dd.min())
+        max_dd = float(drawdown(cum).min())
 
         return {
             "total_return": total_return,
@@ -274,9 +375,15 @@ def main() -> None:
     parser.add_argument("--window", type=int, default=60, help="Rolling z-score window")
     parser.add_argument("--entry-z", type=float, default=ENTRY_Z)
     parser.add_argument("--exit-z", type=float, default=EXIT_Z)
+    parser.add_argument("--static-sizing", action="store_true", help="Size every spread off starting cash (fully vectorized run); overrides compound_sizing in config/model.yaml")
+    parser.add_argument("--record-trades", action="store_true", help="Replay fills through the broker and write paper_trades_<PAIR>")
+    parser.add_argument("--csv", action="store_true", help="Read/write CSV instead of Parquet")
     args = parser.parse_args()
 
-    engine = PairsLiveEngine(pair=args.pair, starting_cash=args.cash, risk_frac=args.risk_frac, window=args.window, entry_z=args.entry_z, exit_z=args.exit_z,)
+    cfg = yaml.safe_load(open(MODEL_CONFIG_PATH, "r", encoding="utf-8")) or {}
+    compound_sizing = bool(cfg.get("compound_sizing", True)) and not args.static_sizing
+
+    engine = PairsLiveEngine(pair=args.pair, starting_cash=args.cash, risk_frac=args.risk_frac, window=args.window, entry_z=args.entry_z, exit_z=args.exit_z, compound_sizing=compound_sizing, record_trades=args.record_trades, csv=args.csv,)
     engine.run()
 
 
@@ -0,0 +1,16 @@
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+CONFIG_DIR = PROJECT_ROOT / "config"
+RAW_DIR = PROJECT_ROOT / "data" / "raw"
+INTERIM_DIR = PROJECT_ROOT / "data" / "interim"
+PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+
+_ensured: set[Path] = set()
+
+
+def ensure_dirs(*dirs: Path) -> None:
+    for d in dirs or (RAW_DIR, INTERIM_DIR, PROCESSED_DIR):
+        if d not in _ensured:
+            d.mkdir(parents=True, exist_ok=True)
+            _ensured.add(d)
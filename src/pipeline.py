@@ -0,0 +1,44 @@
+from pathlib import Path
+import argparse
+
+from src.features.hedge_ratio import compute_hedge, load_pair_prices, print_hedge_summary, write_hedge
+from src.features.signals import add_signals, print_signals_summary, write_signals
+
+
+def build_pair(pair: str, csv: bool = False) -> Path:
+    y_ticker, x_ticker = pair.split("_")
+
+    prices = load_pair_prices(y_ticker, x_ticker, csv)
+    df, meta = compute_hedge(prices, y_ticker, x_ticker)
+    hedge_path, meta_path = write_hedge(df, meta, pair, csv)
+
+    z_col = add_signals(df)
+    signals_path = write_signals(df, pair, csv)
+
+    print_hedge_summary(pair, meta)
+    print_signals_summary(pair, z_col)
+    print(f"[pipeline] saved → {hedge_path}")
+    print(f"[pipeline] saved → {meta_path}")
+    print(f"[pipeline] saved → {signals_path}  (rows={df.shape[0]})")
+
+    return signals_path
+
+
+def main(pair: str | None = None, csv: bool = False) -> Path:
+    parser = argparse.ArgumentParser(description="Build hedge ratio, spread and signals for a pair in one pass")
+    parser.add_argument("--pair", type=str, help="Pair like KO_PEP")
+    parser.add_argument("--csv", action="store_true", help="Read/write CSV instead of Feather/Parquet")
+    args = parser.parse_args()
+
+    if args.pair:
+        pair = args.pair
+    if args.csv:
+        csv = True
+    if not pair:
+        raise ValueError("Must provide --pair like: KO_PEP")
+
+    return build_pair(pair, csv)
+
+
+if __name__ == "__main__":
+    main()
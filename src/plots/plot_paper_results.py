@@ -1,55 +1,74 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-from pathlib import Path
-import numpy as np
+import argparse
+import matplotlib
+matplotlib.use("Agg")
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 
-PROJECT_ROOT = Path(__file__).resolve().parents[2]
-PROCESSED_DIR = PROJECT_ROOT / "data" / "processed"
+from src.backtest.metrics import drawdown
+from src.io import read_table, table_suffix
+from src.paths import PROCESSED_DIR, ensure_dirs
 
 PAIR = "MA_V"
-FILE = PROCESSED_DIR / f"paper_results_{PAIR}.csv"
-
-df = pd.read_csv(FILE, parse_dates=["date"]).set_index("date")
-
-
-plt.figure(figsize=(12,4))
-plt.plot(df["equity"], label="Equity")
-plt.title(f"Equity Curve – {PAIR}")
-plt.ylabel("Portfolio Value ($)")
-plt.tight_layout()
-plt.savefig(PROCESSED_DIR / f"equity_curve_{PAIR}.png")
-plt.close()
-
-
-cummax = df["equity"].cummax()
-drawdown = df["equity"] / cummax - 1
-plt.figure(figsize=(12,4))
-plt.plot(drawdown, color="red")
-plt.title(f"Drawdown – {PAIR}")
-plt.ylabel("Drawdown")
-plt.tight_layout()
-plt.savefig(PROCESSED_DIR / f"drawdown_{PAIR}.png")
-plt.close()
-
-
-plt.figure(figsize=(12,4))
-plt.plot(df["zscore"], label="Z-score")
-plt.axhline(2.0, color="black", linestyle="--", label="Entry +2")
-plt.axhline(-2.0, color="black", linestyle="--", label="Entry -2")
-plt.axhline(0.5, color="gray", linestyle=":", label="Exit band")
-plt.axhline(-0.5, color="gray", linestyle=":")
-plt.title(f"Z-score with Entry/Exit Bands – {PAIR}")
-plt.legend()
-plt.tight_layout()
-plt.savefig(PROCESSED_DIR / f"zscore_signals_{PAIR}.png")
-plt.close()
-
-
-plt.figure(figsize=(6,4))
-df["ret"].hist(bins=50)
-plt.title(f"Daily Return Distribution – {PAIR}")
-plt.tight_layout()
-plt.savefig(PROCESSED_DIR / f"returns_hist_{PAIR}.png")
-plt.close()
-
-print("Saved plots to:", PROCESSED_DIR)
+
+
+def main(pair: str = PAIR, csv: bool = False) -> None:
+    parser = argparse.ArgumentParser(description="Plot paper trading results for a pair")
+    parser.add_argument("--pair", type=str, help="Pair like MA_V")
+    parser.add_argument("--csv", action="store_true", help="Read CSV instead of Parquet")
+    args = parser.parse_args()
+
+    if args.pair:
+        pair = args.pair
+    if args.csv:
+        csv = True
+
+    in_path = PROCESSED_DIR / f"paper_results_{pair}{table_suffix(csv)}"
+    df = read_table(in_path)
+
+    ensure_dirs(PROCESSED_DIR)
+    fig = Figure(figsize=(12,4))
+    canvas = FigureCanvasAgg(fig)
+
+    ax = fig.add_subplot(111)
+    ax.plot(df.index, df["equity"], label="Equity")
+    ax.set_title(f"Equity Curve – {pair}")
+    ax.set_ylabel("Portfolio Value ($)")
+    fig.tight_layout()
+    canvas.print_figure(PROCESSED_DIR / f"equity_curve_{pair}.png")
+    fig.clear()
+
+    dd = drawdown(df["equity"].to_numpy())
+    ax = fig.add_subplot(111)
+    ax.plot(df.index, dd, color="red")
+    ax.set_title(f"Drawdown – {pair}")
+    ax.set_ylabel("Drawdown")
+    fig.tight_layout()
+    canvas.print_figure(PROCESSED_DIR / f"drawdown_{pair}.png")
+    fig.clear()
+
+    ax = fig.add_subplot(111)
+    ax.plot(df.index, df["zscore"], label="Z-score")
+    ax.axhline(2.0, color="black", linestyle="--", label="Entry +2")
+    ax.axhline(-2.0, color="black", linestyle="--", label="Entry -2")
+    ax.axhline(0.5, color="gray", linestyle=":", label="Exit band")
+    ax.axhline(-0.5, color="gray", linestyle=":")
+    ax.set_title(f"Z-score with Entry/Exit Bands – {pair}")
+    ax.legend()
+    fig.tight_layout()
+    canvas.print_figure(PROCESSED_DIR / f"zscore_signals_{pair}.png")
+    fig.clear()
+
+    fig.set_size_inches(6, 4)
+    ax = fig.add_subplot(111)
+    ax.hist(df["ret"].dropna(), bins=50)
+    ax.grid(True)
+    ax.set_title(f"Daily Return Distribution – {pair}")
+    fig.tight_layout()
+    canvas.print_figure(PROCESSED_DIR / f"returns_hist_{pair}.png")
+    fig.clear()
+
+    print("Saved plots to:", PROCESSED_DIR)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+
+from src.live.paper_engine import TRANSACTION_COST, PairsLiveEngine, PaperBroker, simulate
+
+
+def _engine(entry_z, exit_z, beta=0.8, risk_frac=0.5, cash=100_000.0):
+    # Skip __init__ so the test does not depend on processed data on disk.
+    engine = PairsLiveEngine.__new__(PairsLiveEngine)
+    engine.entry_z = entry_z
+    engine.exit_z = exit_z
+    engine.beta = beta
+    engine.risk_frac = risk_frac
+    engine.broker = PaperBroker(starting_cash=cash, record=False)
+    return engine
+
+
+def _nonzero_sign(a, tol=1e-6):
+    # Cumulative sums leave float residue on flat bars, so treat tiny values as zero.
+    return np.sign(np.where(np.abs(a) > tol, a, 0.0))
+
+
+@pytest.mark.parametrize("entry_z, exit_z", [(2.0, 0.5), (1.0, 0.25), (0.5, 1.0), (1.0, 1.0)])
+def test_run_vectorized_matches_simulate(entry_z, exit_z):
+    rng = np.random.default_rng(0)
+    n = 500
+    py = 100.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    px = 80.0 + np.cumsum(rng.normal(0.0, 1.0, n))
+    zv = rng.normal(0.0, 1.5, n)
+    zv[:20] = np.nan
+
+    engine = _engine(entry_z, exit_z)
+    sig, pos_y, pos_x, _, _ = engine._run_vectorized(py, px, zv)
+    ref_sig, ref_y, ref_x, _, _ = simulate(
+        py, px, zv, engine.beta, entry_z, exit_z,
+        engine.risk_frac, TRANSACTION_COST, engine.broker.cash,
+    )
+
+    # Sizing differs (starting cash vs running equity), so compare direction and timing.
+    np.testing.assert_array_equal(sig, ref_sig)
+    np.testing.assert_array_equal(_nonzero_sign(pos_y), _nonzero_sign(ref_y))
+    np.testing.assert_array_equal(_nonzero_sign(pos_x), _nonzero_sign(ref_x))
+    np.testing.assert_array_equal(
+        _nonzero_sign(np.diff(pos_y, prepend=0.0)) != 0,
+        _nonzero_sign(np.diff(ref_y, prepend=0.0)) != 0,
+    )